@@ -5,7 +5,7 @@ from config.config import Config
 
 from controller.controller import PlatformController
 from controller.mock_controller import MockPlatformController
-from controller.pid_controller import PIDPlatformController
+from controller.pid_controller import PIDPlatformController, PID_MAX_GAIN, PID_MAX_OUTPUT
 from controller.gps_location_controller import GPSLocationController
 from controller.screen_ss1306_controller import Ssd1306ScreenController
 
@@ -426,49 +426,50 @@ class AntennyAPI:
                 print("You have chosen <Tune your PID loop>. I hope you brought your tuning fork.")
             print("These values are mostly experimental, but there are plent of online resources for PID tuning best "
                   "practices.")
-            try:
-                print("What should the minimum output value be? (in microseconds)")
-                min_limit = float(input("Min Output(us) (Your current value is {}): ".format(
-                    self.pid_config.get("output_limits")[0])).strip())
-                print("What should the maximum output be?")
-                max_limit = float(input("Max Output(us)  (Your current value is {}): ".format(
-                    self.pid_config.get("output_limits")[1])).strip())
-                print("What should be the period of each PID iteration? (in milliseconds")
-                period = int(input("Period(ms) (Your current value is {}): ".format(self.pid_config.get(
-                    "period"))).strip())
-            except ValueError as e:
-                print("I need a number!")
-                print("What should the minimum output value be?")
-                print("What should the minimum output value be? (in microseconds)")
-                min_limit = float(input("Min Output(us) (Your current value is {}): ".format(
-                    self.pid_config.get("output_limits")[0])).strip())
-                print("What should the maximum output be?")
-                max_limit = float(input("Max Output(us)  (Your current value is {}): ".format(
-                    self.pid_config.get("output_limits")[1])).strip())
-                print("What should be the period of each PID iteration? (in milliseconds")
-                period = int(input("Period(ms) (Your current value is {}): ".format(self.pid_config.get(
-                    "period"))).strip())
+            print("The output limits must be between -{0} and {0} microseconds.".format(PID_MAX_OUTPUT))
+            while True:
+                try:
+                    print("What should the minimum output value be? (in microseconds)")
+                    min_limit = float(input("Min Output(us) (Your current value is {}): ".format(
+                        self.pid_config.get("output_limits")[0])).strip())
+                    print("What should the maximum output be?")
+                    max_limit = float(input("Max Output(us)  (Your current value is {}): ".format(
+                        self.pid_config.get("output_limits")[1])).strip())
+                except ValueError as e:
+                    print("I need a number!")
+                    continue
+                if -PID_MAX_OUTPUT <= min_limit < max_limit <= PID_MAX_OUTPUT:
+                    break
+                print("The minimum must be below the maximum and both must be between -{0} and {0}!".format(
+                    PID_MAX_OUTPUT))
+            while True:
+                try:
+                    print("What should be the period of each PID iteration? (in milliseconds")
+                    period = int(input("Period(ms) (Your current value is {}): ".format(self.pid_config.get(
+                        "period"))).strip())
+                except ValueError as e:
+                    print("I need a number!")
+                    continue
+                if period > 0:
+                    break
+                print("The period must be above 0!")
             self.pid_config.set("output_limits", [min_limit, max_limit])
             self.pid_config.set("period", period)
+            dt = period / 1000
             print("And now the PID constants, it is recommended leaving them default in the beginning.")
-            try:
-                p = float(input("P (Default is 1.0 and current value is {}): ".format(self.pid_config.get(
-                    "p"))).strip())
-                self.pid_config.set("p", p)
-            except ValueError as e:
-                self.pid_config.set("p", 1.0)
-            try:
-                i = float(input("I (Default is 0.0 and current value is {}): ".format(self.pid_config.get(
-                    "i"))).strip())
-                self.pid_config.set("i", i)
-            except ValueError as e:
-                self.pid_config.set("i", 0.0)
-            try:
-                d = float(input("D (Default is 0.0 and current value is {}): ".format(self.pid_config.get(
-                    "d"))).strip())
-                self.pid_config.set("d", d)
-            except ValueError as e:
-                self.pid_config.set("d", 0.0)
+            print("P, I multiplied by the period in seconds and D divided by the period in seconds must each be at "
+                  "most {}.".format(PID_MAX_GAIN))
+            for name, default, scale in (("p", 1.0, 1), ("i", 0.0, dt), ("d", 0.0, 1 / dt)):
+                while True:
+                    try:
+                        value = float(input("{} (Default is {} and current value is {}): ".format(
+                            name.upper(), default, self.pid_config.get(name))).strip())
+                    except ValueError as e:
+                        value = default
+                    if abs(value * scale) <= PID_MAX_GAIN:
+                        break
+                    print("{} is too large for a period of {}ms!".format(name.upper(), period))
+                self.pid_config.set(name, value)
 
         print("You have completed the Antenny manual setup! Please remember to save your config as the default with "
               "api.antenny_save() once you're happy with it.")
@@ -907,7 +908,7 @@ class AntennyAPI:
                 self.elevation_servo,
                 self.imu,
                 pid_output_limits=self.pid_config.get("output_limits"),
-                pid_frequency=self.pid_config.get("period"),
+                pid_period_ms=self.pid_config.get("period"),
                 p=self.pid_config.get("p"),
                 i=self.pid_config.get("i"),
                 d=self.pid_config.get("d")
@@ -1,12 +1,75 @@
-import random
+import array
 import time
 import machine
-from simple_pid.PID import PID
+import micropython
+from micropython import const
 from controller.controller import PlatformController
 from imu.imu import ImuController
 from motor.motor import ServoController
 from config.config import Config
 
+# Set to 1 to print every step of the servo calibration sweeps
+DEBUG = const(0)
+
+# Interval between IMU calibration status polls, leaves the I2C bus and CPU to the PID loop in between
+_CAL_POLL_MS = const(100)
+
+# Default PID output limits
+_OUT_LO = const(-20)
+_OUT_HI = const(20)
+
+# The PID loop runs in fixed point. Angles are carried in 1/256 of a degree and the proportional and derivative
+# gains in 1/4096, so their products and the output are in units of 2^-20. The proportional and derivative terms
+# saturate at _TERM_MAX (512 in output units, far beyond any output limit), so no update can overflow the 32 bit
+# integers viper works with. The integral gain gets a finer 2^-20 scale so that small values survive. It multiplies
+# the clamped sum of the errors, which is accumulated in 1/16 of a degree so the product fits in 32 bits, and the
+# product is shifted back to the output scale. Gains scaled by the period must be at most PID_MAX_GAIN and the output
+# limits within PID_MAX_OUTPUT.
+PID_MAX_GAIN = const(1024)
+PID_MAX_OUTPUT = const(64)
+_ANGLE_SCALE = const(256)
+_GAIN_SCALE = const(4096)
+_KI_SCALE = const(1048576)
+_I_SUM_SHIFT = const(4)
+_KI_SHIFT = const(4)
+_OUT_SHIFT = const(20)
+_TERM_MAX = const(0x20000000)
+
+# Layout of the PID state buffer. Per-axis fields hold the elevation value followed by the azimuth value, and are
+# indexed with the field plus _EL or _AZ.
+_EL = const(0)
+_AZ = const(1)
+_KP = const(0)
+_KI = const(1)
+_KD = const(2)
+_LIMIT_LO = const(3)
+_LIMIT_HI = const(4)
+_P_BOUND = const(5)
+_D_BOUND = const(6)
+_I_SUM_LO = const(7)
+_I_SUM_HI = const(8)
+_I_SUM = const(9)
+_PREV = const(11)
+_SETPOINT = const(13)
+_PID_STATE_SIZE = const(15)
+
+
+@micropython.viper
+def _xorshift32(state: ptr32) -> int:
+    """
+    Advances the 32 bit xorshift state held in state[0], used to pick servo positions while calibrating. The state
+    stays in the buffer and only its low 30 bits are returned, so the result is always a small int.
+    :param state:
+    :return:
+    """
+    x = uint(state[0])
+    x ^= x << 13
+    x ^= x >> 17
+    x ^= x << 5
+    state[0] = x
+    return int(x & 0x3FFFFFFF)
+
+
 class PIDPlatformController(PlatformController):
     """
     Control the antenna motion device of the antenny.
@@ -17,8 +80,8 @@ class PIDPlatformController(PlatformController):
             azimuth: ServoController,
             elevation: ServoController,
             imu: ImuController,
-            pid_output_limits: tuple = (-20, 20),
-            pid_frequency: int = 100,
+            pid_output_limits: tuple = (_OUT_LO, _OUT_HI),
+            pid_period_ms: int = 100,
             p: float = 1.0,
             i: float = 0.0,
             d: float = 0.0,
@@ -29,6 +92,8 @@ class PIDPlatformController(PlatformController):
         self._motion_started = False
         self.pin_interrupt = True
         self.deadzone = None
+        self._dz0_lo = self._dz0_hi = float('inf')
+        self._dz1_lo = self._dz1_hi = float('inf')
         self.timer_id = Config('antenny').get('pid_timer_id')
         print("PID controller using timer hardware id: %d" % (self.timer_id))
         self.pid_loop_timer = machine.Timer(self.timer_id)
@@ -37,29 +102,78 @@ class PIDPlatformController(PlatformController):
         self.new_elevation = 0
         self.new_azimuth = 0
         self.pid_output_limits = pid_output_limits
-        self.pid_frequency = pid_frequency
+        self.pid_period_ms = pid_period_ms
         self.p = p
         self.i = i
         self.d = d
-        self.elevation_pid = None
-        self.azimuth_pid = None
+        self._get_azimuth_elevation = None
+        self._step_elevation = None
+        self._step_azimuth = None
+        self._pid_work_ref = self._pid_work
+        self._pid_pending = False
+        self._rng = array.array('I', [0x12345678])
+        self.pid_state = None
         self.init_pid()
 
     def init_pid(self):
-        self.elevation_pid = PID(
-            setpoint=self.new_elevation,
-            output_limits=self.pid_output_limits,
-            Kp=self.p,
-            Ki=self.i,
-            Kd=self.d
-        )
-        self.azimuth_pid = PID(
-            setpoint=self.new_azimuth,
-            output_limits=self.pid_output_limits,
-            Kp=self.p,
-            Ki=self.i,
-            Kd=self.d
-        )
+        """
+        Loads the PID gains and resets the PID state. The integral and derivative gains are scaled by the fixed
+        timer period once here, so the loop does not need to measure the elapsed time on every tick. The state buffer
+        is only allocated once and is reset in place on later calls. Out of range gains and output limits are clamped
+        with a warning so that an old saved config does not stop the platform from starting.
+        :return:
+        """
+        dt = self.pid_period_ms / 1000
+        gains = []
+        for name, gain in (("P", self.p), ("I*period", self.i * dt), ("D/period", self.d / dt)):
+            if abs(gain) > PID_MAX_GAIN:
+                print("Warning: PID gain %s=%s is out of range and is clamped to +/-%d" % (name, gain, PID_MAX_GAIN))
+                gain = max(-PID_MAX_GAIN, min(gain, PID_MAX_GAIN))
+            gains.append(gain)
+        lo, hi = self.pid_output_limits
+        lo = max(-PID_MAX_OUTPUT, min(lo, PID_MAX_OUTPUT))
+        hi = max(-PID_MAX_OUTPUT, min(hi, PID_MAX_OUTPUT))
+        if lo >= hi:
+            print("Warning: PID output limits %s are invalid, using (%d, %d)" % (self.pid_output_limits, _OUT_LO,
+                                                                               _OUT_HI))
+            lo, hi = _OUT_LO, _OUT_HI
+        elif (lo, hi) != tuple(self.pid_output_limits):
+            print("Warning: PID output limits %s are clamped to (%s, %s)" % (self.pid_output_limits, lo, hi))
+        kp = round(gains[0] * _GAIN_SCALE)
+        ki = round(gains[1] * _KI_SCALE)
+        kd = round(gains[2] * _GAIN_SCALE)
+        for name, gain, fixed in (("P", self.p, kp), ("I", self.i, ki), ("D", self.d, kd)):
+            if gain and not fixed:
+                print("Warning: PID gain %s=%s is too small for the fixed point PID loop and is ignored" % (name, gain))
+        lo = round(lo * (1 << _OUT_SHIFT))
+        hi = round(hi * (1 << _OUT_SHIFT))
+        if ki > 0:
+            i_sum_lo = int((lo << _KI_SHIFT) / ki)
+            i_sum_hi = int((hi << _KI_SHIFT) / ki)
+        elif ki < 0:
+            i_sum_lo = int((hi << _KI_SHIFT) / ki)
+            i_sum_hi = int((lo << _KI_SHIFT) / ki)
+        else:
+            i_sum_lo = i_sum_hi = 0
+        elevation = round(self.new_elevation * _ANGLE_SCALE)
+        azimuth = round(self.new_azimuth * _ANGLE_SCALE)
+        if self.pid_state is None:
+            self.pid_state = array.array('i', [0] * _PID_STATE_SIZE)
+        self.pid_state[_KP] = kp
+        self.pid_state[_KI] = ki
+        self.pid_state[_KD] = kd
+        self.pid_state[_LIMIT_LO] = lo
+        self.pid_state[_LIMIT_HI] = hi
+        self.pid_state[_P_BOUND] = _TERM_MAX // max(abs(kp), 1)
+        self.pid_state[_D_BOUND] = _TERM_MAX // max(abs(kd), 1)
+        self.pid_state[_I_SUM_LO] = i_sum_lo
+        self.pid_state[_I_SUM_HI] = i_sum_hi
+        self.pid_state[_I_SUM + _EL] = 0
+        self.pid_state[_I_SUM + _AZ] = 0
+        self.pid_state[_PREV + _EL] = elevation
+        self.pid_state[_PREV + _AZ] = azimuth
+        self.pid_state[_SETPOINT + _EL] = elevation
+        self.pid_state[_SETPOINT + _AZ] = azimuth
 
     def start(self):
         self.start_pid_loop()
@@ -76,11 +190,11 @@ class PIDPlatformController(PlatformController):
         if self.deadzone is None:
             print("You must orient the device before setting its coordinates!")
             return
-        for dead_zone_min, dead_zone_max in self.deadzone:
-            if dead_zone_min < azimuth < dead_zone_max:
-                print("That coordinate is out of the servo limit, please realign your platform and re-orient")
-                return
+        if self._dz0_lo < azimuth < self._dz0_hi or self._dz1_lo < azimuth < self._dz1_hi:
+            print("That coordinate is out of the servo limit, please realign your platform and re-orient")
+            return
         self.new_azimuth = azimuth
+        self.pid_state[_SETPOINT + _AZ] = round(azimuth * _ANGLE_SCALE)
 
     def get_azimuth(self):
         """
@@ -95,8 +209,8 @@ class PIDPlatformController(PlatformController):
         :param elevation:
         :return:
         """
-        elevation = elevation
         self.new_elevation = elevation
+        self.pid_state[_SETPOINT + _EL] = round(elevation * _ANGLE_SCALE)
 
     def get_elevation(self):
         """
@@ -110,11 +224,18 @@ class PIDPlatformController(PlatformController):
         Initializes the PID timer interrupt
         :return:
         """
-        self.new_elevation = self.imu.get_elevation()
-        self.new_azimuth = self.imu.get_azimuth()
-        self.azimuth_pid.setpoint = self.new_azimuth
-        self.elevation_pid.setpoint = self.new_elevation
-        self.pid_loop_timer.init(period=self.pid_frequency, mode=machine.Timer.PERIODIC, callback=self.__pid_loop)
+        self.new_azimuth, self.new_elevation = self.imu.get_azimuth_elevation()
+        elevation = round(self.new_elevation * _ANGLE_SCALE)
+        azimuth = round(self.new_azimuth * _ANGLE_SCALE)
+        self.pid_state[_PREV + _EL] = elevation
+        self.pid_state[_PREV + _AZ] = azimuth
+        self.pid_state[_SETPOINT + _EL] = elevation
+        self.pid_state[_SETPOINT + _AZ] = azimuth
+        self._get_azimuth_elevation = self.imu.get_azimuth_elevation
+        self._step_elevation = self.elevation.step
+        self._step_azimuth = self.azimuth.step
+        self._pid_pending = False
+        self.pid_loop_timer.init(period=self.pid_period_ms, mode=machine.Timer.PERIODIC, callback=self.__pid_loop)
 
     def stop_pid_loop(self):
         """
@@ -136,23 +257,78 @@ class PIDPlatformController(PlatformController):
 
     def __pid_loop(self, timer):
         """
-        PID ISR
+        PID ISR, only queues the PID update so no work is done in interrupt context. At most one update is queued at
+        a time: ticks that fire while an update is still pending are dropped instead of piling up in the scheduler
+        queue and then running back to back on the same IMU sample, which the gains scaled for a fixed period would
+        not account for.
+        :return:
+        """
+        if self._pid_pending:
+            return
+        self._pid_pending = True
+        try:
+            micropython.schedule(self._pid_work_ref, None)
+        except RuntimeError:
+            # The scheduler queue is shared with other callbacks and is full, drop this tick
+            self._pid_pending = False
+
+    @micropython.native
+    def _pid_work(self, arg):
+        """
+        Runs one PID update of both axes, emitted as native machine code since it runs on every timer tick
+        :param arg:
         :return:
         """
-        self.elevation_pid.setpoint = self.new_elevation
-        self.azimuth_pid.setpoint = self.new_azimuth
-        _elevation = self.get_elevation()
-        _azimuth = self.get_azimuth()
-        el_duty = int(self.elevation_pid(_elevation))
-        az_duty = int(self.azimuth_pid(_azimuth)) * -1
-        self.elevation.step(el_duty)
-        self.azimuth.step(az_duty)
-        # print("""
-        # azimuth: {}
-        # azimuth_duty: {}
-        # elevation: {}
-        # elevation_duty: {}
-        # """.format(_azimuth, az_duty, _elevation, el_duty))
+        try:
+            pid_step = self._pid_step
+            state = self.pid_state
+            _azimuth, _elevation = self._get_azimuth_elevation()
+            el_duty = pid_step(round(_elevation * _ANGLE_SCALE), state, _EL)
+            az_duty = pid_step(round(_azimuth * _ANGLE_SCALE), state, _AZ) * -1
+            self._step_elevation(el_duty)
+            self._step_azimuth(az_duty)
+        finally:
+            self._pid_pending = False
+
+    @micropython.viper
+    def _pid_step(self, position: int, state: ptr32, axis: int) -> int:
+        """
+        Runs one fixed point PID update of an axis of the state buffer and returns the output truncated to an integer
+        :param position:
+        :param state:
+        :param axis:
+        :return:
+        """
+        lo = state[_LIMIT_LO]
+        hi = state[_LIMIT_HI]
+        error = state[_SETPOINT + axis] - position
+        i_sum = state[_I_SUM + axis] + ((error + (1 << (_I_SUM_SHIFT - 1))) >> _I_SUM_SHIFT)
+        if i_sum > state[_I_SUM_HI]:
+            i_sum = state[_I_SUM_HI]
+        elif i_sum < state[_I_SUM_LO]:
+            i_sum = state[_I_SUM_LO]
+        p_error = error
+        bound = state[_P_BOUND]
+        if p_error > bound:
+            p_error = bound
+        elif p_error < 0 - bound:
+            p_error = 0 - bound
+        d_input = position - state[_PREV + axis]
+        bound = state[_D_BOUND]
+        if d_input > bound:
+            d_input = bound
+        elif d_input < 0 - bound:
+            d_input = 0 - bound
+        out = state[_KP] * p_error + ((state[_KI] * i_sum) >> _KI_SHIFT) - state[_KD] * d_input
+        if out > hi:
+            out = hi
+        elif out < lo:
+            out = lo
+        state[_I_SUM + axis] = i_sum
+        state[_PREV + axis] = position
+        if out < 0:
+            return 0 - ((0 - out) >> _OUT_SHIFT)
+        return out >> _OUT_SHIFT
 
     def auto_calibrate_accelerometer(self):
         """
@@ -164,22 +340,17 @@ class PIDPlatformController(PlatformController):
         prev_accel_level = accel_level
         print("Calibrating accelerometer")
         print("Configuration level: {}".format(accel_level))
-        start = time.time()
+        el_min = self.elevation.get_min_position()
+        el_span = self.elevation.get_max_position() - el_min + 1
+        az_min = self.azimuth.get_min_position()
+        az_span = self.azimuth.get_max_position() - az_min + 1
+        start = time.ticks_ms()
         while accel_level < 3:
-            if time.time() - start > 2:
-                self.elevation.set_position(
-                    random.randint(
-                        self.elevation.get_min_position(),
-                        self.elevation.get_max_position()
-                    )
-                )
-                self.azimuth.set_position(
-                    random.randint(
-                        self.azimuth.get_min_position(),
-                        self.azimuth.get_max_position()
-                    )
-                )
-                start = time.time()
+            if time.ticks_diff(time.ticks_ms(), start) > 2000:
+                self.elevation.set_position(el_min + _xorshift32(self._rng) % el_span)
+                self.azimuth.set_position(az_min + _xorshift32(self._rng) % az_span)
+                start = time.ticks_ms()
+            time.sleep_ms(_CAL_POLL_MS)
             accel_level = self.imu.get_accelerometer_status()
             if accel_level != prev_accel_level:
                 print("Configuration level: {}".format(accel_level))
@@ -198,21 +369,28 @@ class PIDPlatformController(PlatformController):
         prev_magnet_level = magnet_level
         print("Calibrating magnetometer")
         print("Configuration level: {}".format(magnet_level))
-        start = time.time()
+        az_min = self.azimuth.get_min_position()
+        az_max = self.azimuth.get_max_position()
+        az_step = (az_max - az_min) >> 3
+        el_min = self.elevation.get_min_position()
+        el_max = self.elevation.get_max_position()
+        el_step = (el_max - el_min) >> 3
+        start = time.ticks_ms()
         count = 0
         count_2 = 0
-        self.elevation.set_position(self.elevation.get_min_position())
+        self.elevation.set_position(el_min)
         while magnet_level < 3:
-            if time.time() - start > 2:
-                self.azimuth.set_position(self.azimuth.get_min_position() + count)
-                count += int((self.azimuth.get_max_position() - self.azimuth.get_min_position()) / 8)
-                if count + self.azimuth.get_min_position() > self.azimuth.get_max_position():
-                    count_2 += int((self.elevation.get_max_position() - self.elevation.get_min_position()) / 8)
-                    if count_2 + self.elevation.get_min_position() > self.elevation.get_max_position():
+            if time.ticks_diff(time.ticks_ms(), start) > 2000:
+                self.azimuth.set_position(az_min + count)
+                count += az_step
+                if count + az_min > az_max:
+                    count_2 += el_step
+                    if count_2 + el_min > el_max:
                         count_2 = 0
-                    self.elevation.set_position(self.elevation.get_min_position() + count_2)
+                    self.elevation.set_position(el_min + count_2)
                     count = 0
-                start = time.time()
+                start = time.ticks_ms()
+            time.sleep_ms(_CAL_POLL_MS)
             magnet_level = self.imu.get_magnetometer_status()
             if magnet_level != prev_magnet_level:
                 print("Configuration level: {}".format(magnet_level))
@@ -232,6 +410,7 @@ class PIDPlatformController(PlatformController):
         print("Calibrating gyroscope")
         print("Configuration level: {}".format(gyro_level))
         while gyro_level < 3:
+            time.sleep_ms(_CAL_POLL_MS)
             gyro_level = self.imu.get_gyro_status()
             if gyro_level != prev_gyro_level:
                 print("Configuration level: {}".format(gyro_level))
@@ -241,6 +420,7 @@ class PIDPlatformController(PlatformController):
         return self.imu.save_gyroscope_calibration()
 
     @staticmethod
+    @micropython.native
     def get_delta(current, prev):
         """
         Gets the difference in the angle
@@ -248,10 +428,9 @@ class PIDPlatformController(PlatformController):
         :param prev:
         :return:
         """
-        d = abs(current - prev)
-        if d > 180:
-            d = 360 - d
-        return d
+        d = current - prev
+        d = d if d >= 0 else -d
+        return 360 - d if d > 180 else d
 
     def auto_calibrate_elevation_servo(self, us=100, d=.5, t=.1):
         """
@@ -260,45 +439,7 @@ class PIDPlatformController(PlatformController):
         :param d:
         :return:
         """
-        moving = False
-        first_move = False
-        self.elevation.set_min_position(0)
-        self.elevation.set_max_position(4095)
-        self.elevation.set_position(int((self.azimuth.get_max_position() - self.azimuth.get_min_position()) / 2))
-        time.sleep(1)
-        prev_elevation = self.imu.get_elevation()
-        for i in range(self.elevation.get_min_position(), self.elevation.get_max_position(), us):
-            self.elevation.set_position(i)
-            time.sleep(t)
-            current = self.imu.get_elevation()
-            delta = self.get_delta(current, prev_elevation)
-            print("{}: {}".format(i, delta))
-            if (delta > d) and not first_move:
-                first_move = True
-                print("First movement detected at {}".format(i))
-                print("Waiting again")
-                print("Previous: {}".format(prev_elevation))
-                print("Current: {}".format(current))
-                print("Delta: {}".format(delta))
-            elif (delta > d) and first_move and not moving:
-                moving = True
-                print("Movement detected at {}".format(i))
-                print("Previous: {}".format(prev_elevation))
-                print("Current: {}".format(current))
-                print("Delta: {}".format(delta))
-                self.elevation.min_us = i + 100
-            elif (delta < d) and moving:
-                self.elevation.set_position(i+100)
-                try_again_delta = self.get_delta(self.imu.get_elevation(), current)
-                if try_again_delta > d:
-                    continue
-                print("No movement detected at {}".format(i))
-                print("Previous: {}".format(prev_elevation))
-                print("Current: {}".format(current))
-                print("Delta: {}".format(delta))
-                self.elevation.max_us = i - 100
-                return
-            prev_elevation = current
+        return self._auto_calibrate_servo(self.elevation, self.imu.get_elevation, us, d, t)
 
     def auto_calibrate_azimuth_servo(self, us=100, d=.5, t=.1):
         """
@@ -307,47 +448,65 @@ class PIDPlatformController(PlatformController):
         :param d:
         :return:
         """
+        return self._auto_calibrate_servo(self.azimuth, self.imu.get_azimuth, us, d, t)
+
+    def _auto_calibrate_servo(self, servo, get_angle, us, d, t):
+        """
+        Sweeps a servo and uses the IMU angle reported by get_angle to find the positions where it starts and stops
+        moving
+        :param servo:
+        :param get_angle:
+        :param us:
+        :param d:
+        :param t:
+        :return:
+        """
         moving = False
         first_move = False
-        self.azimuth.set_min_position(0)
-        self.azimuth.set_max_position(4095)
-        self.elevation.set_position(int((self.azimuth.get_max_position() - self.azimuth.get_min_position()) / 2))
-        self.azimuth.set_position(int((self.azimuth.get_max_position() - self.azimuth.get_min_position()) / 2))
+        servo.set_min_position(0)
+        servo.set_max_position(4095)
+        center = int((self.azimuth.get_max_position() - self.azimuth.get_min_position()) / 2)
+        self.elevation.set_position(center)
+        if servo is not self.elevation:
+            servo.set_position(center)
         time.sleep(1)
-        prev_azimuth = self.imu.get_azimuth()
-
-        for i in range(self.azimuth.get_min_position(), self.azimuth.get_max_position(), us):
-            self.azimuth.set_position(i)
+        prev_angle = get_angle()
+        for i in range(servo.get_min_position(), servo.get_max_position(), us):
+            servo.set_position(i)
             time.sleep(t)
-            current = self.imu.get_azimuth()
-            delta = self.get_delta(current, prev_azimuth)
-            print("{}: {}".format(i, delta))
+            current = get_angle()
+            delta = self.get_delta(current, prev_angle)
+            if DEBUG:
+                print(i, delta)
             if (delta > d) and not first_move:
                 first_move = True
-                print("First movement detected at {}".format(i))
+                print("First movement detected at %d" % i)
                 print("Waiting again")
-                print("Previous: {}".format(prev_azimuth))
-                print("Current: {}".format(current))
-                print("Delta: {}".format(delta))
+                if DEBUG:
+                    print("Previous:", prev_angle)
+                    print("Current:", current)
+                    print("Delta:", delta)
             elif (delta > d) and first_move and not moving:
                 moving = True
-                print("Movement detected at {}".format(i))
-                print("Previous: {}".format(prev_azimuth))
-                print("Current: {}".format(current))
-                print("Delta: {}".format(delta))
-                self.azimuth.min_us = i + 100
+                print("Movement detected at %d" % i)
+                if DEBUG:
+                    print("Previous:", prev_angle)
+                    print("Current:", current)
+                    print("Delta:", delta)
+                servo.min_us = i + 100
             elif (delta < d) and moving:
-                self.azimuth.set_position(i+100)
-                try_again_delta = self.get_delta(self.imu.get_azimuth(), current)
+                servo.set_position(i+100)
+                try_again_delta = self.get_delta(get_angle(), current)
                 if try_again_delta > d:
                     continue
-                print("No movement detected at {}".format(i))
-                print("Previous: {}".format(prev_azimuth))
-                print("Current: {}".format(current))
-                print("Delta: {}".format(delta))
-                self.azimuth.max_us = i - 100
+                print("No movement detected at %d" % i)
+                if DEBUG:
+                    print("Previous:", prev_angle)
+                    print("Current:", current)
+                    print("Delta:", delta)
+                servo.max_us = i - 100
                 return
-            prev_azimuth = current
+            prev_angle = current
 
     def orient(self):
         """
@@ -355,13 +514,38 @@ class PIDPlatformController(PlatformController):
         :return:
         """
         self.azimuth.set_position(self.azimuth.get_min_position())
-        time.sleep(1)
-        min_azimuth = self.imu.get_azimuth()
+        min_azimuth = self._wait_until_settled(self.imu.get_azimuth)
         self.azimuth.set_position(self.azimuth.get_max_position())
-        time.sleep(1)
-        max_azimuth = self.imu.get_azimuth()
+        max_azimuth = self._wait_until_settled(self.imu.get_azimuth)
         if min_azimuth > max_azimuth:
             self.deadzone = [(min_azimuth, 360), (0, max_azimuth)]
         else:
             self.deadzone = [(min_azimuth, max_azimuth)]
+        self._dz0_lo, self._dz0_hi = self.deadzone[0]
+        if len(self.deadzone) > 1:
+            self._dz1_lo, self._dz1_hi = self.deadzone[1]
+        else:
+            self._dz1_lo = self._dz1_hi = float('inf')
         return self.deadzone
+
+    def _wait_until_settled(self, get_angle, eps=.2, timeout_ms=1500):
+        """
+        Samples the IMU angle reported by get_angle every 50ms until it changes by less than eps for 3 samples in a
+        row, or until timeout_ms has passed, and returns the last sample
+        :param get_angle:
+        :param eps:
+        :param timeout_ms:
+        :return:
+        """
+        start = time.ticks_ms()
+        prev = get_angle()
+        settled = 0
+        while settled < 3 and time.ticks_diff(time.ticks_ms(), start) < timeout_ms:
+            time.sleep_ms(50)
+            current = get_angle()
+            if self.get_delta(current, prev) < eps:
+                settled += 1
+            else:
+                settled = 0
+            prev = current
+        return prev
@@ -29,6 +29,13 @@ class ImuController(object):
         """
         raise NotImplementedError()
 
+    def get_azimuth_elevation(self) -> tuple:
+        """
+        Gets the reported azimuth and elevation from a single read of the device
+        :return:
+        """
+        raise NotImplementedError()
+
     def get_accelerometer_status(self):
         """
         Gets the calibration status of the accelerometer
@@ -89,6 +89,18 @@ class Bno055ImuController(ImuController):
         """
         return self.bno.euler()
 
+    def get_azimuth_elevation(self) -> tuple:
+        """
+        Gets the reported azimuth and elevation from a single read of the device
+        :return:
+        """
+        euler = self.bno.euler()
+        new_euler = self.bno.euler()
+        while new_euler[0] != euler[0] or new_euler[2] != euler[2]:
+            euler = self.bno.euler()
+            new_euler = self.bno.euler()
+        return euler[0] % 360, euler[2] % 90
+
     def get_accelerometer_status(self):
         """
         Gets the calibration status of the accelerometer
@@ -63,6 +63,14 @@ class Bno08xImuController(ImuController):
         yaw = math.atan2(2 * w * z + 2 * x * y, 1 - (2 * y * y + 2 * z * z))
         return math.degrees(yaw), math.degrees(roll), math.degrees(pitch)
 
+    def get_azimuth_elevation(self) -> tuple:
+        """
+        Gets the reported azimuth and elevation from a single read of the device
+        :return:
+        """
+        euler = self.get_euler()
+        return euler[0], euler[2]
+
     def get_accelerometer_status(self):
         """
         Gets the calibration status of the accelerometer
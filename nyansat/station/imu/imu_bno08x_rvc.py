@@ -86,6 +86,17 @@ class Bno08xUARTImuController(ImuController):
         """
         return self.euler
 
+    def get_azimuth_elevation(self) -> tuple:
+        """
+        Gets the reported azimuth and elevation from a single read of the device
+        :return:
+        """
+        euler = self.euler
+        azimuth = euler[0]
+        if azimuth < 0:
+            azimuth = 360 + azimuth
+        return azimuth, abs(euler[1])
+
     def get_accelerometer_status(self):
         """
         Gets the calibration status of the accelerometer
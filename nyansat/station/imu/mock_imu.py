@@ -29,6 +29,13 @@ class MockImuController(ImuController):
         """Return Euler angles in degrees: (heading, roll, pitch)."""
         return 0, 0, 0
 
+    def get_azimuth_elevation(self) -> tuple:
+        """
+        Gets the azimuth and elevation of the imu in degrees
+        :return:
+        """
+        return 0, 0
+
     def get_accelerometer_status(self):
         """
         Gets the calibration status of the accelerometer
@@ -46,12 +46,13 @@ class Pca9685ServoController(ServoController):
         self.index = index
         self.min_us = None
         self.max_us = None
+        self._period_us = 1000000 / self.pwm_controller.frequency
 
     def _us2duty(self, us):
-        return int(4095 * us / (1000000 / self.pwm_controller.frequency))
+        return int(4095 * us / self._period_us)
 
     def _duty2us(self, duty):
-        return int(duty * (1000000 / self.pwm_controller.frequency) / 4095)
+        return int(duty * self._period_us / 4095)
 
     def set_min_position(self, min_us):
         """